@@ -9,7 +9,7 @@ from pymongo import MongoClient
 from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
-from typing import Union
+from typing import List, Union
 from pydantic import BaseModel
 
 # Load environment variables from .env file
@@ -22,7 +22,16 @@ database_url = os.getenv("DATABASE_URL")
 database_name = os.getenv("DATABASE_NAME")
 
 if database_url and database_name:
-    _client = MongoClient(database_url)
+    # Pool sized for uvicorn worker concurrency; idle sockets are kept warm
+    # for a minute so bursts don't pay for fresh connections.
+    _client = MongoClient(
+        database_url,
+        maxPoolSize=50,
+        minPoolSize=5,
+        maxIdleTimeMS=60000,
+        serverSelectionTimeoutMS=2000,
+        compressors="zstd",
+    )
     db = _client[database_name]
 
 # Helper functions for common database operations
@@ -37,19 +46,64 @@ def create_document(collection_name: str, data: Union[BaseModel, dict]):
     else:
         data_dict = data.copy()
 
-    data_dict['created_at'] = datetime.now(timezone.utc)
-    data_dict['updated_at'] = datetime.now(timezone.utc)
+    now = datetime.now(timezone.utc)
+    data_dict['created_at'] = now
+    data_dict['updated_at'] = now
 
     result = db[collection_name].insert_one(data_dict)
     return str(result.inserted_id)
 
-def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
-    """Get documents from collection"""
+def create_documents(collection_name: str, items: List[Union[BaseModel, dict]]):
+    """Insert several documents with timestamps in a single round-trip"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    if not items:
+        return []
+
+    now = datetime.now(timezone.utc)
+    docs = []
+    for data in items:
+        data_dict = data.model_dump() if isinstance(data, BaseModel) else data.copy()
+        data_dict['created_at'] = now
+        data_dict['updated_at'] = now
+        docs.append(data_dict)
+
+    result = db[collection_name].insert_many(docs, ordered=False)
+    return [str(_id) for _id in result.inserted_ids]
+
+def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None, sort: list = None, projection: dict = None):
+    """Get documents from collection, optionally sorted and projected server-side"""
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
     
-    cursor = db[collection_name].find(filter_dict or {})
+    cursor = db[collection_name].find(filter_dict or {}, projection)
+    if sort:
+        cursor = cursor.sort(sort)
     if limit:
         cursor = cursor.limit(limit)
     
     return list(cursor)
+
+# Per-user collections and the indexes backing their user_id lookups.
+# Date-keyed collections get a compound index so newest-first reads are cheap.
+USER_INDEXES = {
+    "profile": [("user_id", 1)],
+    "preferences": [("user_id", 1)],
+    "habit": [("user_id", 1)],
+    "routine": [("user_id", 1)],
+    "task": [("user_id", 1)],
+    "journalentry": [("user_id", 1), ("date", -1)],
+    "mood": [("user_id", 1), ("date", -1)],
+    "moneyrecord": [("user_id", 1), ("date", -1)],
+    "savingsgoal": [("user_id", 1)],
+    "fitnessmetric": [("user_id", 1), ("date", -1)],
+    "coachplan": [("user_id", 1), ("date", -1)],
+}
+
+def ensure_indexes():
+    """Create the per-user indexes (no-op if they already exist)"""
+    if db is None:
+        return
+    for collection_name, keys in USER_INDEXES.items():
+        db[collection_name].create_index(keys)
@@ -1,12 +1,24 @@
+import asyncio
+import logging
 import os
-from datetime import datetime, timedelta
-from typing import List, Optional
-
-from fastapi import FastAPI, HTTPException
+import time
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+from typing import List, Optional, Union
+
+import msgspec
+import orjson
+from cachetools import TTLCache
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
 from pydantic import BaseModel
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
-from database import db, create_document, get_documents
+from database import db, create_document, create_documents, get_documents, ensure_indexes
 from schemas import (
     Profile,
     Preferences,
@@ -20,37 +32,153 @@ from schemas import (
     FitnessMetric,
     Challenge,
     CoachPlan,
-    export_schemas,
+    export_schemas_json,
+)
+import schemas_fast
+
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the connection pool and build indexes before accepting traffic.
+    # A failure here must not block startup: /test reports DB problems.
+    if db is not None:
+        try:
+            db.command("ping")
+            ensure_indexes()
+        except Exception as e:
+            logger.warning("Database warm-up failed: %s", e)
+    yield
+    if db is not None:
+        db.client.close()
+
+
+# Unhandled errors surface as a 500 with the error message, so endpoints
+# don't need their own try/except blocks. Converting inside the route (rather
+# than with an app-level Exception handler) keeps the response inside
+# CORSMiddleware, so browsers can still read the error.
+class ErrorRoute(APIRoute):
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request):
+            try:
+                return await handler(request)
+            except (StarletteHTTPException, RequestValidationError):
+                raise
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=str(e))
+
+        return route_handler
+
+
+app = FastAPI(title="Self-Mastery API", version="1.0.0", default_response_class=ORJSONResponse, lifespan=lifespan)
+app.router.route_class = ErrorRoute
+
+# Explicit origins from CORS_ORIGINS (comma-separated) plus local dev servers.
+# When CORS_ORIGINS is unset, keep allowing any origin as before.
+_cors_origins = {o.strip() for o in os.getenv("CORS_ORIGINS", "").split(",") if o.strip()}
+ALLOWED_ORIGINS = (
+    frozenset(_cors_origins | {"http://localhost:3000", "http://localhost:5173"})
+    if _cors_origins
+    else frozenset({"*"})
 )
-
-app = FastAPI(title="Self-Mastery API", version="1.0.0")
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=list(ALLOWED_ORIGINS),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
 
+# Helper for endpoints whose JSON body is serialized once at import
+def _json_bytes(content: bytes) -> Response:
+    return Response(content=content, media_type="application/json")
+
+
+_ROOT_BYTES = orjson.dumps({"status": "ok", "name": "Self-Mastery API"})
+
+
 @app.get("/")
 def root():
-    return {"status": "ok", "name": "Self-Mastery API"}
+    return _json_bytes(_ROOT_BYTES)
+
+
+# Schemas never change at runtime, so dump and serialize them once at import.
+_SCHEMA_BYTES = export_schemas_json()
+
+# Collection name -> model, used to rebuild trusted documents on reads.
+_MODEL_MAP = {
+    "profile": Profile,
+    "preferences": Preferences,
+    "habit": Habit,
+    "routine": Routine,
+    "task": Task,
+    "journalentry": JournalEntry,
+    "mood": Mood,
+    "moneyrecord": MoneyRecord,
+    "savingsgoal": SavingsGoal,
+    "fitnessmetric": FitnessMetric,
+    "challenge": Challenge,
+    "coachplan": CoachPlan,
+}
 
 
 @app.get("/schema")
 def get_schema():
-    return [s.model_dump() for s in export_schemas()]
+    return _json_bytes(_SCHEMA_BYTES)
+
+
+# Lightweight views: list endpoints for these collections only return the
+# projected fields.
+_LIST_PROJECTIONS = {
+    "habit": {"name": 1, "icon": 1, "glow_color": 1, "streak": 1, "_id": 0},
+}
+
+# Short-lived per-worker cache of list results, keyed by (collection, user_id).
+# Writes through _insert drop the affected key.
+_list_cache = TTLCache(maxsize=10_000, ttl=5)
+
+
+# Helper to list a user's documents. Stored documents were validated on
+# write, so skip re-validation with model_construct, and hand the plain
+# dicts straight to ORJSONResponse instead of FastAPI's encoder.
+def _list(collection: str, user_id: str):
+    key = (collection, user_id)
+    docs = _list_cache.get(key)
+    if docs is None:
+        projection = _LIST_PROJECTIONS.get(collection)
+        docs = get_documents(collection, {"user_id": user_id}, projection=projection)
+        if projection is None:
+            model = _MODEL_MAP[collection]
+            docs = [model.model_construct(**d).model_dump() for d in docs]
+        _list_cache[key] = docs
+    return ORJSONResponse(docs)
+
+
+# Routes that decode their body with schemas_fast still document it in
+# OpenAPI using the matching Pydantic model.
+def _body_schema(model: type[BaseModel]) -> dict:
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": model.model_json_schema()}},
+        }
+    }
 
 
 # Helper to insert and return
-async def _insert(collection: str, payload: BaseModel):
-    try:
-        _id = create_document(collection, payload)
-        return {"id": _id}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def _insert(collection: str, payload: Union[BaseModel, msgspec.Struct]):
+    if isinstance(payload, msgspec.Struct):
+        payload = msgspec.structs.asdict(payload)
+    _id = create_document(collection, payload)
+    user_id = payload["user_id"] if isinstance(payload, dict) else payload.user_id
+    _list_cache.pop((collection, user_id), None)
+    return {"id": _id}
 
 
 # Onboarding/Profile
@@ -70,13 +198,17 @@ async def create_habit(habit: Habit):
     return await _insert("habit", habit)
 
 
-@app.get("/habit")
+@app.post("/habit/bulk")
+async def create_habits(habits: List[Habit]):
+    ids = create_documents("habit", habits)
+    for user_id in {h.user_id for h in habits}:
+        _list_cache.pop(("habit", user_id), None)
+    return {"ids": ids}
+
+
+@app.get("/habit", response_model=None)
 async def list_habits(user_id: str):
-    try:
-        docs = get_documents("habit", {"user_id": user_id})
-        return docs
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return _list("habit", user_id)
 
 
 # Routines
@@ -85,13 +217,9 @@ async def create_routine(routine: Routine):
     return await _insert("routine", routine)
 
 
-@app.get("/routine")
+@app.get("/routine", response_model=None)
 async def list_routines(user_id: str):
-    try:
-        docs = get_documents("routine", {"user_id": user_id})
-        return docs
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return _list("routine", user_id)
 
 
 # Tasks
@@ -100,58 +228,42 @@ async def create_task(task: Task):
     return await _insert("task", task)
 
 
-@app.get("/task")
+@app.get("/task", response_model=None)
 async def list_tasks(user_id: str):
-    try:
-        docs = get_documents("task", {"user_id": user_id})
-        return docs
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return _list("task", user_id)
 
 
 # Journal
-@app.post("/journal")
-async def create_journal(entry: JournalEntry):
+@app.post("/journal", openapi_extra=_body_schema(JournalEntry))
+async def create_journal(entry: schemas_fast.JournalEntry = Depends(schemas_fast.parse_journal_entry)):
     return await _insert("journalentry", entry)
 
 
-@app.get("/journal")
+@app.get("/journal", response_model=None)
 async def list_journal(user_id: str):
-    try:
-        docs = get_documents("journalentry", {"user_id": user_id})
-        return docs
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return _list("journalentry", user_id)
 
 
 # Mood
-@app.post("/mood")
-async def create_mood(mood: Mood):
+@app.post("/mood", openapi_extra=_body_schema(Mood))
+async def create_mood(mood: schemas_fast.Mood = Depends(schemas_fast.parse_mood)):
     return await _insert("mood", mood)
 
 
-@app.get("/mood")
+@app.get("/mood", response_model=None)
 async def list_moods(user_id: str):
-    try:
-        docs = get_documents("mood", {"user_id": user_id})
-        return docs
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return _list("mood", user_id)
 
 
 # Money
-@app.post("/money")
-async def create_money(record: MoneyRecord):
+@app.post("/money", openapi_extra=_body_schema(MoneyRecord))
+async def create_money(record: schemas_fast.MoneyRecord = Depends(schemas_fast.parse_money_record)):
     return await _insert("moneyrecord", record)
 
 
-@app.get("/money")
+@app.get("/money", response_model=None)
 async def list_money(user_id: str):
-    try:
-        docs = get_documents("moneyrecord", {"user_id": user_id})
-        return docs
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return _list("moneyrecord", user_id)
 
 
 @app.post("/savings-goal")
@@ -159,28 +271,20 @@ async def create_goal(goal: SavingsGoal):
     return await _insert("savingsgoal", goal)
 
 
-@app.get("/savings-goal")
+@app.get("/savings-goal", response_model=None)
 async def list_goals(user_id: str):
-    try:
-        docs = get_documents("savingsgoal", {"user_id": user_id})
-        return docs
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return _list("savingsgoal", user_id)
 
 
 # Fitness
-@app.post("/fitness")
-async def create_fitness(metric: FitnessMetric):
+@app.post("/fitness", openapi_extra=_body_schema(FitnessMetric))
+async def create_fitness(metric: schemas_fast.FitnessMetric = Depends(schemas_fast.parse_fitness_metric)):
     return await _insert("fitnessmetric", metric)
 
 
-@app.get("/fitness")
+@app.get("/fitness", response_model=None)
 async def list_fitness(user_id: str):
-    try:
-        docs = get_documents("fitnessmetric", {"user_id": user_id})
-        return docs
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return _list("fitnessmetric", user_id)
 
 
 # Challenges
@@ -189,42 +293,70 @@ PRESET_CHALLENGES = [
     {"slug": "glowup-30", "title": "30 Day Glow Up", "days": 30, "category": "glowup", "description": "Daily actions for visible improvement."},
     {"slug": "money-21", "title": "Money Sprint 21", "days": 21, "category": "money", "description": "Cash flow, skills, and savings."},
 ]
+_PRESET_BYTES = orjson.dumps(PRESET_CHALLENGES)
 
 
 @app.get("/challenges")
 async def list_challenges():
-    return PRESET_CHALLENGES
+    return _json_bytes(_PRESET_BYTES)
 
 
 # AI Coach (simple rules-based demo, cloud-ready)
+_STRESS_MOODS = frozenset({"stressed", "sad"})
+
+# Focus items for each rule, in bit order: stressed mood, >5 tasks, <3 habits.
+_FOCUS_RULES = (
+    ("short wins", "breathing", "walk"),
+    ("prioritize top 3",),
+    ("add a keystone habit",),
+)
+_FOCUS_DEFAULT = ("consistency", "deep work", "hydration")
+
+# Every combination of the rule bits mapped to its focus list.
+_FOCUS_TABLE = tuple(
+    sum((rule for i, rule in enumerate(_FOCUS_RULES) if bits >> i & 1), ()) or _FOCUS_DEFAULT
+    for bits in range(1 << len(_FOCUS_RULES))
+)
+
+# The plan only counts habits/routines/tasks and reads mood + date.
+_ID_ONLY = {"_id": 1}
+_MOOD_FIELDS = {"mood": 1, "date": 1, "_id": 0}
+
+# [checked_at, "YYYY-MM-DD"]; the date is recomputed at most once a minute
+_today_cache = [0.0, ""]
+
+
+def _today_str() -> str:
+    now = time.time()
+    if now - _today_cache[0] > 60:
+        _today_cache[:] = [now, date.today().isoformat()]
+    return _today_cache[1]
+
+
 @app.post("/coach/plan")
 async def generate_coach_plan(user_id: str, mood: Optional[str] = None):
-    try:
-        today = datetime.now().strftime("%Y-%m-%d")
-        habits = get_documents("habit", {"user_id": user_id})
-        routines = get_documents("routine", {"user_id": user_id})
-        tasks = get_documents("task", {"user_id": user_id})
-        recent_moods = get_documents("mood", {"user_id": user_id})[-7:]
-
-        focus = []
-        if mood in ("stressed", "sad"):
-            focus += ["short wins", "breathing", "walk"]
-        if len(tasks) > 5:
-            focus += ["prioritize top 3"]
-        if len(habits) < 3:
-            focus += ["add a keystone habit"]
-        if not focus:
-            focus = ["consistency", "deep work", "hydration"]
-
-        actions = [
-            {"title": "10-min warmup", "time": "05:15"},
-            {"title": "Deep work block", "time": "06:00"},
-            {"title": "Move + hydrate", "time": "08:00"},
-        ]
-        plan = CoachPlan(user_id=user_id, date=today, summary="Personalized plan generated.", focus=focus, actions=actions)
-        return await _insert("coachplan", plan)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    today = _today_str()
+    # Independent reads: run them on the threadpool so the round-trips overlap
+    query = {"user_id": user_id}
+    habits, routines, tasks, moods = await asyncio.gather(
+        run_in_threadpool(get_documents, "habit", query, projection=_ID_ONLY),
+        run_in_threadpool(get_documents, "routine", query, projection=_ID_ONLY),
+        run_in_threadpool(get_documents, "task", query, projection=_ID_ONLY),
+        run_in_threadpool(get_documents, "mood", query, sort=[("date", -1)], limit=7, projection=_MOOD_FIELDS),
+    )
+    recent_moods = moods[::-1]
+
+    bits = (mood in _STRESS_MOODS) | ((len(tasks) > 5) << 1) | ((len(habits) < 3) << 2)
+    focus = list(_FOCUS_TABLE[bits])
+
+    actions = [
+        {"title": "10-min warmup", "time": "05:15"},
+        {"title": "Deep work block", "time": "06:00"},
+        {"title": "Move + hydrate", "time": "08:00"},
+    ]
+    # Built entirely from server-side values, so skip validation
+    plan = CoachPlan.model_construct(user_id=user_id, date=today, summary="Personalized plan generated.", focus=focus, actions=actions)
+    return await _insert("coachplan", plan)
 
 
 @app.get("/test")
@@ -252,4 +384,13 @@ def test_database():
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Multiple workers need the import string rather than the app object
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        access_log=False,
+    )
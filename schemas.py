@@ -6,8 +6,9 @@ class name as the collection name (e.g., Habit -> "habit").
 
 These schemas are used for validation at the API boundary.
 """
+from functools import lru_cache
 from typing import List, Optional, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from datetime import datetime
 
 # Core user profile and preferences
@@ -123,9 +124,18 @@ class SchemaDescription(BaseModel):
     fields: dict
 
 
+_SCHEMA_ADAPTER = TypeAdapter(List[SchemaDescription])
+
+
 def export_schemas() -> list[SchemaDescription]:
     models = [Profile, Preferences, Habit, Routine, Task, JournalEntry, Mood, MoneyRecord, SavingsGoal, FitnessMetric, Challenge, CoachPlan]
     out = []
     for m in models:
         out.append(SchemaDescription(name=m.__name__.lower(), fields=m.model_json_schema()))
     return out
+
+
+@lru_cache(maxsize=None)
+def export_schemas_json() -> bytes:
+    # Serialized once; the immutable bytes are safe to share between callers
+    return _SCHEMA_ADAPTER.dump_json(export_schemas())
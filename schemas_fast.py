@@ -0,0 +1,90 @@
+"""
+msgspec mirrors of the high-volume write schemas
+
+Mood, JournalEntry, MoneyRecord and FitnessMetric are posted far more often
+than anything else, so their request bodies are decoded and validated with
+msgspec instead of Pydantic. Field names, types and defaults match the
+Pydantic models in schemas.py, which remain the source for /schema and the
+OpenAPI request bodies. Decoding is lax (strict=False) so the same inputs
+are accepted, e.g. "12.5" for a float, and errors are raised in FastAPI's
+422 format.
+"""
+import re
+from typing import List, Optional, Literal
+
+import msgspec
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+
+# Journal & mood
+class JournalEntry(msgspec.Struct):
+    user_id: str
+    date: str
+    content: str
+    template: Literal["gratitude", "reflection", "ideas", "free"] = "free"
+    locked: bool = False
+
+class Mood(msgspec.Struct):
+    user_id: str
+    date: str
+    mood: Literal["ecstatic", "happy", "calm", "neutral", "stressed", "sad"]
+    reason: Optional[str] = None
+
+# Money hub
+class MoneyRecord(msgspec.Struct):
+    user_id: str
+    date: str
+    type: Literal["income", "expense", "saving"]
+    amount: float
+    note: Optional[str] = None
+
+# Fitness & glow-up
+class FitnessMetric(msgspec.Struct):
+    user_id: str
+    date: str
+    weight: Optional[float] = None
+    steps: Optional[int] = None
+    hydration_liters: Optional[float] = None
+    skincare: List[str] = []
+    gym_routine: List[dict] = []
+    checklist: List[dict] = []
+
+
+_PATH_PART = re.compile(r"\.(\w+)|\[(\d+)\]")
+_MISSING_FIELD = re.compile(r"^Object missing required field `(\w+)`$")
+
+
+def _validation_error(e: msgspec.ValidationError) -> dict:
+    """Translate a msgspec error ("... - at `$.a[0]`") into a FastAPI error entry"""
+    msg, sep, path = str(e).rpartition(" - at `")
+    if not sep:
+        msg, path = str(e), "$`"
+    loc = ["body"]
+    for name, index in _PATH_PART.findall(path[1:-1]):
+        loc.append(name or int(index))
+    missing = _MISSING_FIELD.match(msg)
+    if missing:
+        loc.append(missing.group(1))
+        return {"type": "missing", "loc": loc, "msg": "Field required"}
+    return {"type": "value_error", "loc": loc, "msg": msg}
+
+
+def _body_parser(struct_type):
+    """Build a FastAPI dependency that decodes the JSON body into struct_type"""
+    decoder = msgspec.json.Decoder(struct_type, strict=False)
+
+    async def parse(request: Request):
+        try:
+            return decoder.decode(await request.body())
+        except msgspec.ValidationError as e:
+            raise RequestValidationError([_validation_error(e)])
+        except msgspec.DecodeError as e:
+            raise RequestValidationError([{"type": "json_invalid", "loc": ["body"], "msg": "JSON decode error", "ctx": {"error": str(e)}}])
+
+    return parse
+
+
+parse_journal_entry = _body_parser(JournalEntry)
+parse_mood = _body_parser(Mood)
+parse_money_record = _body_parser(MoneyRecord)
+parse_fitness_metric = _body_parser(FitnessMetric)